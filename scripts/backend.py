@@ -1,34 +1,426 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 import json
+import math
+import os
 import random
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
 from typing import List, Dict, Any
 
 app = FastAPI(title="Mort and Ricky Quiz API", version="1.0.0")
 
-# Enable CORS for React frontend
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173"], 
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+class StringTable:
+    """Deduplicated string storage shared by every question in the bank"""
+    __slots__ = ("strings", "index", "refs")
+
+    def __init__(self):
+        self.strings = []
+        self.index = {}
+        self.refs = 0
+
+    def intern(self, text):
+        """Return the slot of text, storing it only the first time it is seen"""
+        self.refs += 1
+        slot = self.index.get(text)
+        if slot is None:
+            slot = len(self.strings)
+            self.strings.append(text)
+            self.index[text] = slot
+        return slot
+
+    def __getitem__(self, slot):
+        return self.strings[slot]
+
+    def __len__(self):
+        return len(self.strings)
+
+
+class QuestionRecord:
+    """Compact question whose text fields are slots in the shared string table"""
+    __slots__ = ("id", "type", "question", "correct_answer", "options", "correct_index")
+
+    def __init__(self, raw, table):
+        self.id = raw["id"]
+        self.type = table.intern(raw.get("type", "unknown"))
+        self.question = table.intern(raw["question"])
+        self.options = tuple(table.intern(option) for option in raw["options"])
+        self.correct_index = raw["correct_index"]
+        if "correct_answer" in raw:
+            correct_answer = raw["correct_answer"]
+        else:
+            correct_answer = raw["options"][self.correct_index]
+        self.correct_answer = table.intern(correct_answer)
+
+    def to_dict(self, table):
+        """Rebuild the question in the same shape as quiz_questions.json"""
+        return {
+            "id": self.id,
+            "question": table[self.question],
+            "correct_answer": table[self.correct_answer],
+            "type": table[self.type],
+            "options": [table[slot] for slot in self.options],
+            "correct_index": self.correct_index
+        }
+
+    def to_quiz_dict(self, table):
+        """Question without the correct answer, for sending to the frontend"""
+        return {
+            "id": self.id,
+            "question": table[self.question],
+            "options": [table[slot] for slot in self.options],
+            "type": table[self.type]
+        }
+
+
+def memory_report(table, records):
+    """Estimate how much memory the interned bank uses and saves"""
+    unique_bytes = sum(sys.getsizeof(text) for text in table.strings)
+    # Every reference beyond the first would have been its own copy with json.load
+    counts = {}
+    for record in records:
+        for slot in (record.type, record.question, record.correct_answer) + record.options:
+            counts[slot] = counts.get(slot, 0) + 1
+    duplicate_bytes = sum(
+        sys.getsizeof(table[slot]) * (count - 1) for slot, count in counts.items()
+    )
+    record_bytes = sum(
+        sys.getsizeof(record) + sys.getsizeof(record.options) for record in records
+    )
+    return {
+        "unique_strings": len(table),
+        "string_references": table.refs,
+        "string_bytes": unique_bytes,
+        "record_bytes": record_bytes,
+        "bytes_saved_by_interning": duplicate_bytes
+    }
 
-# Global variable to store questions
+# Global variables to store questions
+string_table = StringTable()
 quiz_questions = []
+questions_by_id = {}
+bank_memory = {}
+
+def build_bank(raw_questions):
+    """Intern raw question dicts into a fresh string table, record list, id index and memory report"""
+    table = StringTable()
+    records = [QuestionRecord(raw, table) for raw in raw_questions]
+    by_id = {}
+    for record in records:
+        by_id.setdefault(str(record.id), record)
+    return table, records, by_id, memory_report(table, records)
+
+# The streaming pipeline publishes NDJSON, question_generator.py writes JSON;
+# whichever was published last is served
+BANK_FILES = ['quiz_questions.ndjson', 'quiz_questions.json']
+bank_version = None
+
+def bank_file_version():
+    """Return (filename, mtime) of the newest bank file, or None if there is none"""
+    versions = []
+    for filename in BANK_FILES:
+        try:
+            versions.append((filename, os.stat(filename).st_mtime_ns))
+        except FileNotFoundError:
+            continue
+    if not versions:
+        return None
+    # max() keeps the first of equally new files, so NDJSON wins ties
+    return max(versions, key=lambda version: version[1])
+
+def iter_bank_file(filename):
+    """Yield raw question dicts from an NDJSON or JSON bank file"""
+    with open(filename, 'r') as f:
+        if filename.endswith('.ndjson'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+def read_bank(version):
+    """Build the bank for a version returned by bank_file_version()"""
+    if version is None:
+        return build_bank([])
+    return build_bank(iter_bank_file(version[0]))
+
+def install_bank(version, bank):
+    """Swap in a bank built by read_bank()"""
+    global string_table, quiz_questions, questions_by_id, bank_memory, bank_version
+    string_table, quiz_questions, questions_by_id, bank_memory = bank
+    bank_version = version
+    if version is None:
+        print("No question bank found. Please run pipeline.py or question_generator.py first.")
+    else:
+        print(f"Loaded {len(quiz_questions)} questions from {version[0]} ({len(string_table)} unique strings)")
 
 def load_questions():
-    """Load questions from JSON file"""
-    global quiz_questions
+    """Load questions from the published bank file"""
+    version = bank_file_version()
+    install_bank(version, read_bank(version))
+
+bank_reloading = False
+
+async def reload_if_changed():
+    """Reload the bank if a new one has been published since it was loaded"""
+    global bank_version, bank_reloading
+    version = bank_file_version()
+    if version == bank_version or bank_reloading:
+        return
+    bank_reloading = True
     try:
-        with open('quiz_questions.json', 'r') as f:
-            quiz_questions = json.load(f)
-        print(f"Loaded {len(quiz_questions)} questions")
-    except FileNotFoundError:
-        print("quiz_questions.json not found. Please run question_generator.py first.")
-        quiz_questions = []
+        # Parse off the event loop; other requests keep using the current bank meanwhile
+        bank = await run_in_threadpool(read_bank, version)
+    except Exception as e:
+        # A malformed, half-written or vanished file must not take the API down.
+        # Remember the version so it is only retried once the file changes again.
+        print(f"Failed to load {version[0]}: {e}. Keeping the current {len(quiz_questions)} questions.")
+        bank_version = version
+        return
+    finally:
+        bank_reloading = False
+    install_bank(version, bank)
+
+# Admission control limits
+ADMISSION_DB = os.environ.get('ADMISSION_DB', 'admission.db')
+ADMISSION_TIMEOUT = 0.05         # seconds to wait for the store before using per-worker buckets
+COUNTER_FLUSH_INTERVAL = 5.0     # seconds between writes of per-worker counters to the store
+MAX_CONCURRENT_REQUESTS = 64     # per worker; anything beyond is shed with 503
+MAX_BODY_BYTES = 64 * 1024
+MAX_QUIZ_QUESTIONS = 50
+MAX_ANSWERS = MAX_QUIZ_QUESTIONS
+
+# Token buckets per client and route group: (capacity, tokens refilled per second)
+ROUTE_LIMITS = {
+    "questions": (5, 5 / 60),    # full bank dump
+    "quiz": (60, 1.0),
+    "submit": (30, 0.5),
+    "default": (120, 2.0)
+}
+
+def route_cost(path):
+    """Return the route group and token cost of a request path"""
+    if path == "/api/questions":
+        return "questions", 1
+    if path.startswith("/api/quiz/"):
+        try:
+            num_questions = int(path.rsplit("/", 1)[1])
+        except ValueError:
+            return "quiz", 1
+        # Bigger quizzes cost more, capped at the size we will actually serve
+        return "quiz", 1 + min(max(num_questions, 0), MAX_QUIZ_QUESTIONS) // 10
+    if path == "/api/submit-quiz":
+        return "submit", 1
+    return "default", 1
+
+
+class AdmissionStore:
+    """Token buckets and counters kept in SQLite so every worker shares them
+
+    The database is opened on first use. If it can't be opened, an in-memory
+    database is used instead and limits are enforced per worker only.
+
+    Each worker also remembers the tokens the store last reported per bucket.
+    Other workers only ever take tokens, so that is an upper bound: requests
+    it already rules out are rejected without touching the store, and it is
+    the worker's own bucket whenever the store is busy or broken.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = None
+        self.lock = threading.Lock()
+        self.takes = 0
+        # Per-worker state, only touched on the event loop
+        self.in_flight = 0
+        self.local_tokens = {}
+        self.worker_counters = {
+            "admitted": 0, "rate_limited": 0, "shed": 0, "too_large": 0, "store_errors": 0
+        }
+        self.unflushed = {}
+        self.last_flush = time.monotonic()
+
+    def count(self, name):
+        """Count an admission decision; flushed to the shared counters later"""
+        self.worker_counters[name] += 1
+        self.unflushed[name] = self.unflushed.get(name, 0) + 1
+
+    def _due_counters(self, force=False):
+        if not self.unflushed or (
+            not force and time.monotonic() - self.last_flush < COUNTER_FLUSH_INTERVAL
+        ):
+            return {}
+        pending, self.unflushed = self.unflushed, {}
+        self.last_flush = time.monotonic()
+        return pending
+
+    def _restore_counters(self, pending):
+        for name, value in pending.items():
+            self.unflushed[name] = self.unflushed.get(name, 0) + value
+
+    def _local_estimate(self, key, capacity, refill_rate, now):
+        if key not in self.local_tokens:
+            return capacity
+        tokens, updated = self.local_tokens[key]
+        return min(capacity, tokens + (now - updated) * refill_rate)
+
+    async def admit(self, key, capacity, refill_rate, cost):
+        """Take cost tokens from a bucket; return seconds to wait, or 0 if admitted"""
+        estimate = self._local_estimate(key, capacity, refill_rate, time.time())
+        if estimate < cost:
+            self.count("rate_limited")
+            return (cost - estimate) / refill_rate
+        
+        pending = self._due_counters()
+        try:
+            wait, tokens, updated = await run_in_threadpool(
+                self.take, key, capacity, refill_rate, cost, pending
+            )
+        except sqlite3.Error as e:
+            self._restore_counters(pending)
+            self.count("store_errors")
+            print(f"Admission store error: {e}")
+            # Enforce this worker's own bucket rather than letting everything through
+            updated = time.time()
+            tokens = self._local_estimate(key, capacity, refill_rate, updated)
+            wait = 0 if tokens >= cost else (cost - tokens) / refill_rate
+            if not wait:
+                tokens -= cost
+        
+        self.local_tokens[key] = (tokens, updated)
+        self.count("rate_limited" if wait else "admitted")
+        self.takes += 1
+        if self.takes % 1000 == 0:
+            # Buckets idle this long have refilled completely
+            cutoff = time.time() - 3600
+            self.local_tokens = {
+                k: v for k, v in self.local_tokens.items() if v[1] >= cutoff
+            }
+        return wait
+
+    def _connect(self):
+        if self.conn is not None:
+            return self.conn
+        try:
+            self.conn = self._open(self.path)
+        except sqlite3.Error as e:
+            print(f"Admission store {self.path} unavailable ({e}), limiting per worker instead")
+            self.path = ":memory:"
+            self.conn = self._open(self.path)
+        return self.conn
+
+    def _open(self, path):
+        # Setup can wait a little for other workers; per-request use cannot
+        conn = sqlite3.connect(path, timeout=1.0, isolation_level=None, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)"
+            )
+            conn.execute(f"PRAGMA busy_timeout = {int(ADMISSION_TIMEOUT * 1000)}")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    @contextmanager
+    def _locked(self):
+        if not self.lock.acquire(timeout=ADMISSION_TIMEOUT):
+            raise sqlite3.OperationalError("admission store is busy")
+        try:
+            yield
+        finally:
+            self.lock.release()
+
+    def take(self, key, capacity, refill_rate, cost, pending=None):
+        """Take cost tokens from the shared bucket and flush pending counters
+
+        Returns (seconds to wait or 0, tokens left, time). Blocks on SQLite, so
+        call it from a thread rather than the event loop. Raises
+        sqlite3.OperationalError if the store stays busy past ADMISSION_TIMEOUT.
+        """
+        with self._locked():
+            conn = self._connect()
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * refill_rate)
+                wait = 0 if tokens >= cost else (cost - tokens) / refill_rate
+                # A rejection leaves the bucket as it was, so there is nothing to write
+                if not wait:
+                    tokens -= cost
+                    conn.execute(
+                        "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                        (key, tokens, now)
+                    )
+                self._flush(conn, pending)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            if self.takes % 1000 == 0:
+                conn.execute("DELETE FROM buckets WHERE updated < ?", (now - 3600,))
+            return wait, tokens, now
+
+    def _flush(self, conn, pending):
+        for name, value in (pending or {}).items():
+            conn.execute(
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (name, value)
+            )
+
+    def read_counters(self, pending=None):
+        """Flush pending counters and return the shared totals; call it from a thread"""
+        with self._locked():
+            conn = self._connect()
+            if pending:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._flush(conn, pending)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            return dict(conn.execute("SELECT name, value FROM counters").fetchall())
+
+    async def report(self):
+        """Shared counters plus this worker's own"""
+        report = {
+            "store": self.path,
+            "worker_counters": dict(self.worker_counters),
+            "in_flight": self.in_flight,
+            "max_concurrent_requests": MAX_CONCURRENT_REQUESTS
+        }
+        pending = self._due_counters(force=True)
+        try:
+            report["counters"] = await run_in_threadpool(self.read_counters, pending)
+        except sqlite3.Error as e:
+            self._restore_counters(pending)
+            report["counters"] = {}
+            report["store_error"] = str(e)
+        # The store path may have changed if it had to fall back
+        report["store"] = self.path
+        return report
+
+
+admission = AdmissionStore(ADMISSION_DB)
+
+def reject(status_code, detail, retry_after=None):
+    headers = {"Retry-After": str(math.ceil(retry_after))} if retry_after else None
+    return JSONResponse(status_code=status_code, content={"detail": detail}, headers=headers)
 
 # Load questions on startup
 load_questions()
@@ -37,6 +429,93 @@ load_questions()
 async def startup_event():
     load_questions()
 
+@app.middleware("http")
+async def pick_up_published_bank(request, call_next):
+    await reload_if_changed()
+    return await call_next(request)
+
+@app.middleware("http")
+async def admission_control(request, call_next):
+    """Shed load and enforce per-client rate limits before doing any work"""
+    if admission.in_flight >= MAX_CONCURRENT_REQUESTS:
+        admission.count("shed")
+        return reject(503, "Server is busy, please retry", retry_after=1)
+    
+    # Counted from here so requests queued for the store count towards the cap
+    admission.in_flight += 1
+    try:
+        group, cost = route_cost(request.url.path)
+        capacity, refill_rate = ROUTE_LIMITS[group]
+        client = request.client.host if request.client else "unknown"
+        wait = await admission.admit(f"{client}:{group}", capacity, refill_rate, cost)
+        if wait:
+            return reject(429, "Too many requests", retry_after=wait)
+        return await call_next(request)
+    finally:
+        admission.in_flight -= 1
+
+class BodySizeLimitMiddleware:
+    """Reject request bodies over MAX_BODY_BYTES, whether or not they declare a length"""
+
+    def __init__(self, app, max_bytes=MAX_BODY_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        
+        too_large = f"Request body must be at most {self.max_bytes} bytes"
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and (
+            not content_length.isdigit() or int(content_length) > self.max_bytes
+        ):
+            admission.count("too_large")
+            return await reject(413, too_large)(scope, receive, send)
+        
+        # Chunked bodies carry no length, so count bytes as the app reads them.
+        # On overflow, answer 413 ourselves, tell the app the client went away
+        # and drop whatever it tries to send back.
+        received = 0
+        rejected = False
+        response_started = False
+        
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    rejected = True
+                    admission.count("too_large")
+                    if not response_started:
+                        await reject(413, too_large)(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+        
+        async def limited_send(message):
+            nonlocal response_started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        await self.app(scope, limited_receive, limited_send)
+
+app.add_middleware(BodySizeLimitMiddleware)
+
+# Enable CORS for React frontend; added last so its headers also reach 429/503 responses
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["http://localhost:5173"], 
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
 @app.get("/")
 async def root():
     return {"message": "Mort and Ricky Quiz API", "total_questions": len(quiz_questions)}
@@ -46,7 +525,8 @@ async def get_all_questions():
     """Get all available questions"""
     if not quiz_questions:
         raise HTTPException(status_code=404, detail="No questions available")
-    return {"questions": quiz_questions, "total": len(quiz_questions)}
+    questions = [q.to_dict(string_table) for q in quiz_questions]
+    return {"questions": questions, "total": len(questions)}
 
 @app.get("/api/quiz/{num_questions}")
 async def get_quiz(num_questions: int):
@@ -54,21 +534,19 @@ async def get_quiz(num_questions: int):
     if not quiz_questions:
         raise HTTPException(status_code=404, detail="No questions available")
     
+    if num_questions < 1 or num_questions > MAX_QUIZ_QUESTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"num_questions must be between 1 and {MAX_QUIZ_QUESTIONS}"
+        )
+    
     if num_questions > len(quiz_questions):
         num_questions = len(quiz_questions)
     
     selected_questions = random.sample(quiz_questions, num_questions)
     
     # Remove correct answers from the response (frontend shouldn't know)
-    quiz_data = []
-    for q in selected_questions:
-        quiz_question = {
-            "id": q["id"],
-            "question": q["question"],
-            "options": q["options"],
-            "type": q["type"]
-        }
-        quiz_data.append(quiz_question)
+    quiz_data = [q.to_quiz_dict(string_table) for q in selected_questions]
     
     return {"questions": quiz_data, "total": len(quiz_data)}
 
@@ -80,24 +558,30 @@ async def submit_quiz(submission: Dict[str, Any]):
     if not user_answers:
         raise HTTPException(status_code=400, detail="No answers provided")
     
+    if not isinstance(user_answers, dict) or len(user_answers) > MAX_ANSWERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"answers must map at most {MAX_ANSWERS} question ids to option indexes"
+        )
+    
     results = []
     correct_count = 0
     
     for question_id, user_answer in user_answers.items():
         # Find the original question
-        original_question = next((q for q in quiz_questions if str(q["id"]) == str(question_id)), None)
+        original_question = questions_by_id.get(str(question_id))
         
         if original_question:
-            is_correct = user_answer == original_question["correct_index"]
+            is_correct = user_answer == original_question.correct_index
             if is_correct:
                 correct_count += 1
             
             results.append({
                 "question_id": question_id,
-                "question": original_question["question"],
+                "question": string_table[original_question.question],
                 "user_answer": user_answer,
-                "correct_answer": original_question["correct_index"],
-                "correct_answer_text": original_question["options"][original_question["correct_index"]],
+                "correct_answer": original_question.correct_index,
+                "correct_answer_text": string_table[original_question.options[original_question.correct_index]],
                 "is_correct": is_correct
             })
     
@@ -117,16 +601,23 @@ async def submit_quiz(submission: Dict[str, Any]):
 async def get_stats():
     """Get quiz statistics"""
     if not quiz_questions:
-        return {"total_questions": 0, "question_types": {}}
+        return {
+            "total_questions": 0,
+            "question_types": {},
+            "memory": bank_memory,
+            "admission": await admission.report()
+        }
     
     question_types = {}
     for q in quiz_questions:
-        q_type = q.get("type", "unknown")
+        q_type = string_table[q.type]
         question_types[q_type] = question_types.get(q_type, 0) + 1
     
     return {
         "total_questions": len(quiz_questions),
-        "question_types": question_types
+        "question_types": question_types,
+        "memory": bank_memory,
+        "admission": await admission.report()
     }
 
 if __name__ == "__main__":
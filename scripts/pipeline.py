@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+from scraper import iter_rick_and_morty_episodes
+from question_generator import iter_all_questions
+
+@contextmanager
+def publishing():
+    """Collect staged files and rename them all into place once every one is complete
+
+    Yields a list that staged_ndjson_writer() appends (temp_path, filename) to.
+    If anything fails before the renames, every staged file is discarded.
+    """
+    staged = []
+    try:
+        yield staged
+    except BaseException:
+        for temp_path, _ in staged:
+            os.unlink(temp_path)
+        raise
+    # Everything is written and synced, so only the renames are left; they are
+    # back to back in the same directory and the bank file goes last
+    for index, (temp_path, filename) in enumerate(staged):
+        try:
+            os.replace(temp_path, filename)
+        except BaseException:
+            for unpublished_path, _ in staged[index:]:
+                os.unlink(unpublished_path)
+            raise
+
+@contextmanager
+def staged_ndjson_writer(filename, staged):
+    """Write one JSON record per line to a temp file next to filename, staging it on success"""
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".ndjson")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            def write(record):
+                f.write(json.dumps(record))
+                f.write("\n")
+            yield write
+            f.flush()
+            os.fsync(f.fileno())
+            # mkstemp creates files as 0600; the backend may run as another user
+            os.fchmod(f.fileno(), 0o644)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    staged.append((temp_path, filename))
+
+@contextmanager
+def atomic_ndjson_writer(filename):
+    """Write one JSON record per line to a temp file, renaming it over filename on success"""
+    with publishing() as staged:
+        with staged_ndjson_writer(filename, staged) as write:
+            yield write
+
+def run_pipeline(episodes_file="scraped_data.ndjson", bank_file="quiz_questions.ndjson"):
+    """Scrape episodes, generate questions and publish the bank in one pass
+
+    Both files are fully written before either is renamed into place, so a
+    failed scrape or generation leaves the published files as they were.
+    """
+    # Distractors are drawn from every episode, so episodes are kept in memory;
+    # questions, the bulk of the output, are streamed straight to disk
+    episodes_data = []
+    with publishing() as staged:
+        with staged_ndjson_writer(episodes_file, staged) as write_episode:
+            for episode in iter_rick_and_morty_episodes():
+                write_episode(episode)
+                episodes_data.append(episode)
+        if not episodes_data:
+            raise RuntimeError("No episodes scraped, keeping the current question bank")
+        
+        question_count = 0
+        with staged_ndjson_writer(bank_file, staged) as write_question:
+            for question in iter_all_questions(episodes_data):
+                write_question(question)
+                question_count += 1
+    print(f"Saved {len(episodes_data)} episodes to {episodes_file}")
+    print(f"Published {question_count} questions to {bank_file}")
+    return question_count
+
+if __name__ == "__main__":
+    run_pipeline()
@@ -1,10 +1,27 @@
 import json
+import os
 import random
 
-def load_scraped_data(filename="scraped_data.json"):
-    """Load scraped data from JSON file"""
+# pipeline.py writes NDJSON, scraper.py writes JSON
+SCRAPED_FILES = ["scraped_data.ndjson", "scraped_data.json"]
+
+def newest_scraped_file():
+    """Return whichever scraped data file was written last, or None"""
+    existing = [filename for filename in SCRAPED_FILES if os.path.exists(filename)]
+    if not existing:
+        return None
+    return max(existing, key=lambda filename: os.stat(filename).st_mtime_ns)
+
+def load_scraped_data(filename=None):
+    """Load scraped data from a JSON or NDJSON file, by default the newest one"""
+    filename = filename or newest_scraped_file()
+    if filename is None:
+        print("No scraped data found. Please run scraper.py or pipeline.py first.")
+        return []
     try:
         with open(filename, 'r') as f:
+            if filename.endswith('.ndjson'):
+                return [json.loads(line) for line in f if line.strip()]
             return json.load(f)
     except FileNotFoundError:
         print(f"File {filename} not found. Please run scraper.py first.")
@@ -12,13 +29,17 @@ def load_scraped_data(filename="scraped_data.json"):
 
 def generate_episode_questions(episodes_data):
     """Generate questions about episode titles and summaries"""
-    questions = []
+    return list(iter_episode_questions(episodes_data))
+
+def iter_episode_questions(episodes_data):
+    """Generate questions about episode titles and summaries, yielding each one as it is built"""
+    count = 0
     
     for episode in episodes_data:
         # Question 1: What happened in this episode?
         if episode.get('summary') and len(episode['summary']) > 20:
             question = {
-                "id": len(questions) + 1,
+                "id": count + 1,
                 "question": f"What happens in the Rick and Morty episode '{episode['title']}'?",
                 "correct_answer": episode['summary'],
                 "type": "episode_summary"
@@ -33,12 +54,13 @@ def generate_episode_questions(episodes_data):
             
             question["options"] = all_options
             question["correct_index"] = all_options.index(episode['summary'])
-            questions.append(question)
+            count += 1
+            yield question
         
         # Question 2: Which episode is this?
         if episode.get('summary') and len(episode['summary']) > 20:
             question = {
-                "id": len(questions) + 1,
+                "id": count + 1,
                 "question": f"Which Rick and Morty episode features this plot: '{episode['summary'][:100]}...'?",
                 "correct_answer": episode['title'],
                 "type": "episode_identification"
@@ -53,13 +75,16 @@ def generate_episode_questions(episodes_data):
             
             question["options"] = all_options
             question["correct_index"] = all_options.index(episode['title'])
-            questions.append(question)
-    
-    return questions
+            count += 1
+            yield question
 
 def generate_character_questions(episodes_data):
     """Generate questions about characters"""
-    questions = []
+    return list(iter_character_questions(episodes_data))
+
+def iter_character_questions(episodes_data):
+    """Generate questions about characters, yielding each one as it is built"""
+    count = 0
     all_characters = set()
     
     # Collect all characters
@@ -75,7 +100,7 @@ def generate_character_questions(episodes_data):
             character = random.choice(episode['characters'])
             
             question = {
-                "id": len(questions) + 1000,  # Different ID range
+                "id": count + 1000,  # Different ID range
                 "question": f"Which character appears in the Rick and Morty episode '{episode['title']}'?",
                 "correct_answer": character,
                 "type": "character_episode"
@@ -90,14 +115,15 @@ def generate_character_questions(episodes_data):
             
             question["options"] = all_options
             question["correct_index"] = all_options.index(character)
-            questions.append(question)
+            count += 1
+            yield question
     
     # Generate general character questions
     main_characters = ["Rick Sanchez", "Morty Smith", "Summer Smith", "Jerry Smith", "Beth Smith"]
     for char in main_characters:
         if char in all_characters:
             question = {
-                "id": len(questions) + 1000,
+                "id": count + 1000,
                 "question": f"What is {char.split()[0]}'s relationship to the main family in Rick and Morty?",
                 "correct_answer": get_character_relationship(char),
                 "type": "character_relationship"
@@ -116,9 +142,8 @@ def generate_character_questions(episodes_data):
             
             question["options"] = all_options
             question["correct_index"] = all_options.index(get_character_relationship(char))
-            questions.append(question)
-    
-    return questions
+            count += 1
+            yield question
 
 def get_character_relationship(character):
     """Get the relationship of a character to the Smith family"""
@@ -133,7 +158,11 @@ def get_character_relationship(character):
 
 def generate_quote_questions(episodes_data):
     """Generate questions about quotes"""
-    questions = []
+    return list(iter_quote_questions(episodes_data))
+
+def iter_quote_questions(episodes_data):
+    """Generate questions about quotes, yielding each one as it is built"""
+    count = 0
     
     for episode in episodes_data:
         if episode.get('quotes') and len(episode['quotes']) > 0:
@@ -141,7 +170,7 @@ def generate_quote_questions(episodes_data):
             
             # Question: Which episode featured this quote?
             question = {
-                "id": len(questions) + 2000,  # Different ID range
+                "id": count + 2000,  # Different ID range
                 "question": f"Which Rick and Morty episode features the quote: '{quote}'?",
                 "correct_answer": episode['title'],
                 "type": "quote_episode"
@@ -156,7 +185,8 @@ def generate_quote_questions(episodes_data):
             
             question["options"] = all_options
             question["correct_index"] = all_options.index(episode['title'])
-            questions.append(question)
+            count += 1
+            yield question
     
     # Add some famous Rick and Morty quote questions
     famous_quotes = [
@@ -184,7 +214,7 @@ def generate_quote_questions(episodes_data):
     
     for quote_data in famous_quotes:
         question = {
-            "id": len(questions) + 2000,
+            "id": count + 2000,
             "question": f"Who says the famous line: '{quote_data['quote']}'?",
             "correct_answer": quote_data['character'],
             "type": "quote_character"
@@ -199,13 +229,16 @@ def generate_quote_questions(episodes_data):
         
         question["options"] = all_options
         question["correct_index"] = all_options.index(quote_data['character'])
-        questions.append(question)
-    
-    return questions
+        count += 1
+        yield question
 
 def generate_trivia_questions(episodes_data):
     """Generate general Rick and Morty trivia questions"""
-    questions = []
+    return list(iter_trivia_questions(episodes_data))
+
+def iter_trivia_questions(episodes_data):
+    """Generate general Rick and Morty trivia questions, yielding each one as it is built"""
+    count = 0
     
     trivia_questions = [
         {
@@ -242,7 +275,7 @@ def generate_trivia_questions(episodes_data):
     
     for i, trivia in enumerate(trivia_questions):
         question = {
-            "id": len(questions) + 3000 + i,
+            "id": count + 3000 + i,
             "question": trivia["question"],
             "correct_answer": trivia["correct_answer"],
             "type": "trivia"
@@ -253,9 +286,8 @@ def generate_trivia_questions(episodes_data):
         
         question["options"] = all_options
         question["correct_index"] = all_options.index(trivia["correct_answer"])
-        questions.append(question)
-    
-    return questions
+        count += 1
+        yield question
 
 def generate_all_questions():
     """Generate all types of questions"""
@@ -282,6 +314,13 @@ def generate_all_questions():
     
     return all_questions
 
+def iter_all_questions(episodes_data):
+    """Generate all types of questions one at a time, without the final shuffle"""
+    yield from iter_episode_questions(episodes_data)
+    yield from iter_character_questions(episodes_data)
+    yield from iter_quote_questions(episodes_data)
+    yield from iter_trivia_questions(episodes_data)
+
 def save_questions(questions, filename="quiz_questions.json"):
     """Save generated questions to JSON file"""
     with open(filename, 'w') as f:
@@ -4,10 +4,54 @@ import json
 import re
 import time
 
+# Added to episodes that don't have many characters or quotes
+COMMON_CHARACTERS = [
+    "Rick Sanchez", "Morty Smith", "Summer Smith", "Jerry Smith", "Beth Smith",
+    "Mr. Meeseeks", "Birdperson", "Squanch", "Mr. Poopybutthole", "Evil Morty",
+    "Jessica", "Principal Vagina", "Tammy", "Unity", "Pickle Rick"
+]
+
+COMMON_QUOTES = [
+    "Wubba lubba dub dub!",
+    "Aw geez Rick!",
+    "I'm Pickle Rick!",
+    "Nobody exists on purpose, nobody belongs anywhere, everybody's gonna die.",
+    "That's slavery with extra steps!",
+    "Your boos mean nothing, I've seen what makes you cheer!",
+    "I'm Mr. Meeseeks, look at me!",
+    "Ooh wee!",
+    "In bird culture, this is considered a dick move.",
+    "Get schwifty!",
+    "Tiny Rick!",
+    "Show me what you got!",
+    "I like what you got!",
+    "My man!",
+    "Lookin' good!",
+    "Slow down!",
+    "Yes!",
+    "Snap!",
+    "Hungry for apples?",
+    "Lick lick lick my balls!"
+]
+
+def enhance_episode(episode):
+    """Pad an episode with common characters and quotes if it has few of its own"""
+    if len(episode["characters"]) < 3:
+        episode["characters"].extend(COMMON_CHARACTERS[:3])
+    if len(episode["quotes"]) < 2:
+        episode["quotes"].extend(COMMON_QUOTES[:2])
+    return episode
+
 def scrape_rick_and_morty_data():
     """
     Scrape Rick and Morty data from Wikipedia
     """
+    return list(iter_rick_and_morty_episodes())
+
+def iter_rick_and_morty_episodes():
+    """
+    Scrape Rick and Morty data from Wikipedia, yielding each episode as soon as it is parsed
+    """
     print("Scraping Rick and Morty data from Wikipedia...")
     
     # Main Rick and Morty Wikipedia page
@@ -18,7 +62,7 @@ def scrape_rick_and_morty_data():
     "User-Agent": "Chrome/5.0"
 }
     
-    episodes_data = []
+    scraped_count = 0
     
     try:
         # Scrape main page for general info
@@ -72,20 +116,21 @@ def scrape_rick_and_morty_data():
                         
                         if title and len(title) > 3:
                             episode_data = {
-                                "episode_number": episode_num or f"Episode {len(episodes_data) + 1}",
+                                "episode_number": episode_num or f"Episode {scraped_count + 1}",
                                 "title": title,
                                 "summary": summary or f"Rick and Morty episode: {title}",
                                 "characters": ["Rick Sanchez", "Morty Smith"],  # Default main characters
                                 "quotes": []  # Will be populated with generic quotes
                             }
-                            episodes_data.append(episode_data)
+                            scraped_count += 1
+                            yield enhance_episode(episode_data)
                             
                     except Exception as e:
                         print(f"Error processing row: {e}")
                         continue
         
         # If we didn't get enough episodes from tables, add some well-known ones
-        if len(episodes_data) < 10:
+        if scraped_count < 10:
             print("Adding well-known Rick and Morty episodes...")
             known_episodes = [
                 {
@@ -159,50 +204,19 @@ def scrape_rick_and_morty_data():
                     "quotes": ["Bird Person, I can't do this anymore.", "Tammy, don't be gross."]
                 }
             ]
-            episodes_data.extend(known_episodes)
-        
-        # Add some common Rick and Morty characters to episodes that don't have many
-        common_characters = [
-            "Rick Sanchez", "Morty Smith", "Summer Smith", "Jerry Smith", "Beth Smith",
-            "Mr. Meeseeks", "Birdperson", "Squanch", "Mr. Poopybutthole", "Evil Morty",
-            "Jessica", "Principal Vagina", "Tammy", "Unity", "Pickle Rick"
-        ]
-        
-        common_quotes = [
-            "Wubba lubba dub dub!",
-            "Aw geez Rick!",
-            "I'm Pickle Rick!",
-            "Nobody exists on purpose, nobody belongs anywhere, everybody's gonna die.",
-            "That's slavery with extra steps!",
-            "Your boos mean nothing, I've seen what makes you cheer!",
-            "I'm Mr. Meeseeks, look at me!",
-            "Ooh wee!",
-            "In bird culture, this is considered a dick move.",
-            "Get schwifty!",
-            "Tiny Rick!",
-            "Show me what you got!",
-            "I like what you got!",
-            "My man!",
-            "Lookin' good!",
-            "Slow down!",
-            "Yes!",
-            "Snap!",
-            "Hungry for apples?",
-            "Lick lick lick my balls!"
-        ]
-        
-        # Enhance episodes with more characters and quotes
-        for episode in episodes_data:
-            if len(episode["characters"]) < 3:
-                episode["characters"].extend(common_characters[:3])
-            if len(episode["quotes"]) < 2:
-                episode["quotes"].extend(common_quotes[:2])
+            for episode in known_episodes:
+                scraped_count += 1
+                yield enhance_episode(episode)
         
-        print(f"Successfully scraped {len(episodes_data)} episodes")
-        return episodes_data
+        print(f"Successfully scraped {scraped_count} episodes")
         
     except Exception as e:
         print(f"Error scraping Wikipedia: {e}")
+        if scraped_count:
+            # Episodes already yielded can't be taken back, so fail rather than
+            # let a partial scrape pass for a complete one
+            print(f"Scrape stopped after {scraped_count} episodes")
+            raise
         print("Falling back to known Rick and Morty episodes...")
         
         # Fallback data if scraping fails
@@ -243,7 +257,7 @@ def scrape_rick_and_morty_data():
                 "quotes": ["That's slavery with extra steps!", "Your boos mean nothing!"]
             }
         ]
-        return fallback_episodes
+        yield from fallback_episodes
 
 def save_scraped_data(data, filename="scraped_data.json"):
     """Save scraped data to JSON file"""
@@ -0,0 +1,280 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import httpx
+import pytest
+
+os.environ.setdefault("ADMISSION_DB", os.path.join(tempfile.mkdtemp(), "admission.db"))
+
+from fastapi.testclient import TestClient
+
+import backend
+
+
+def make_question(question_id):
+    return {
+        "id": question_id,
+        "question": f"Question {question_id}?",
+        "correct_answer": "Yes",
+        "type": "trivia",
+        "options": ["Yes", "No"],
+        "correct_index": 0
+    }
+
+
+def write_bank(path, lines):
+    with open(path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+    # Make sure the mtime moves even on filesystems with coarse timestamps
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    backend.install_bank(None, backend.build_bank([]))
+    return TestClient(backend.app)
+
+
+def episode_question(question_id, title, distractors):
+    options = [title] + distractors
+    return {
+        "id": question_id,
+        "question": f"Which episode features quote {question_id}?",
+        "correct_answer": title,
+        "type": "quote_episode",
+        "options": options,
+        "correct_index": 0
+    }
+
+
+def test_title_used_as_answer_and_distractor_is_stored_once():
+    table, records, by_id, memory = backend.build_bank([
+        episode_question(1, "Pickle Rick", ["Pilot", "Total Rickall"]),
+        episode_question(2, "Pilot", ["Pickle Rick", "Total Rickall"])
+    ])
+    assert table.strings.count("Pickle Rick") == 1
+    assert records[0].options[0] == records[1].options[1]
+    # 2 x (type, question, correct answer, 3 options) references, 6 unique strings
+    assert table.refs == 12
+    assert len(table) == 6
+    assert memory["unique_strings"] == 6
+    assert memory["string_references"] == 12
+    assert memory["bytes_saved_by_interning"] > 0
+
+
+def test_to_dict_round_trips_bank_records():
+    with open(os.path.join(os.path.dirname(__file__), '..', 'quiz_questions.json')) as f:
+        raw_questions = json.load(f)
+    table, records, by_id, memory = backend.build_bank(raw_questions)
+    assert [record.to_dict(table) for record in records] == raw_questions
+    assert list(records[0].to_dict(table)) == list(raw_questions[0])
+
+
+def test_missing_correct_answer_comes_from_options():
+    raw = make_question(1)
+    del raw["correct_answer"]
+    raw["correct_index"] = 1
+    table, records, by_id, memory = backend.build_bank([raw])
+    assert records[0].to_dict(table)["correct_answer"] == "No"
+
+
+def test_correct_answer_is_kept_even_if_index_is_out_of_range():
+    raw = make_question(1)
+    raw["correct_index"] = 5
+    table, records, by_id, memory = backend.build_bank([raw])
+    assert table[records[0].correct_answer] == "Yes"
+
+
+def test_submit_quiz_scores_through_id_index(client, store):
+    backend.install_bank(None, backend.build_bank([make_question(1), make_question(2)]))
+    response = client.post("/api/submit-quiz", json={"answers": {"1": 0, "2": 1, "99": 0}})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["score"] == {"correct": 1, "total": 2, "percentage": 50.0}
+    assert [r["correct_answer_text"] for r in body["results"]] == ["Yes", "Yes"]
+    assert [r["is_correct"] for r in body["results"]] == [True, False]
+
+
+def test_stats_include_memory_report(client, store):
+    backend.install_bank(None, backend.build_bank([make_question(1)]))
+    memory = client.get("/api/stats").json()["memory"]
+    assert set(memory) == {
+        "unique_strings", "string_references", "string_bytes",
+        "record_bytes", "bytes_saved_by_interning"
+    }
+    assert memory["unique_strings"] == 4
+
+
+def test_published_bank_is_picked_up(client, tmp_path):
+    write_bank(tmp_path / "quiz_questions.ndjson", [json.dumps(make_question(1))])
+    assert client.get("/").json()["total_questions"] == 1
+
+
+def test_newest_bank_file_is_served(client, tmp_path):
+    ndjson, legacy = tmp_path / "quiz_questions.ndjson", tmp_path / "quiz_questions.json"
+    write_bank(ndjson, [json.dumps(make_question(1))])
+    legacy.write_text(json.dumps([make_question(1), make_question(2)]))
+    os.utime(ndjson, ns=(0, 1_000_000_000))
+    os.utime(legacy, ns=(0, 2_000_000_000))
+    assert client.get("/").json()["total_questions"] == 2
+
+    os.utime(ndjson, ns=(0, 3_000_000_000))
+    assert client.get("/").json()["total_questions"] == 1
+
+
+def test_malformed_bank_keeps_serving_current_questions(client, tmp_path, monkeypatch):
+    bank = tmp_path / "quiz_questions.ndjson"
+    write_bank(bank, [json.dumps(make_question(1)), json.dumps(make_question(2))])
+    assert client.get("/").json()["total_questions"] == 2
+
+    write_bank(bank, [json.dumps(make_question(3)), "{not json"])
+    assert client.get("/").json()["total_questions"] == 2
+    assert client.get("/api/quiz/1").status_code == 200
+
+    # The failed version is not parsed again on every request
+    with monkeypatch.context() as patch:
+        patch.setattr(backend, "read_bank", lambda version: pytest.fail("reloaded again"))
+        assert client.get("/api/stats").status_code == 200
+
+    write_bank(bank, [json.dumps(make_question(4))])
+    assert client.get("/").json()["total_questions"] == 1
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = backend.AdmissionStore(str(tmp_path / "admission.db"))
+    monkeypatch.setattr(backend, "admission", store)
+    return store
+
+
+def test_rate_limited_requests_get_429_with_retry_after(client, store):
+    capacity, refill_rate = backend.ROUTE_LIMITS["questions"]
+    for _ in range(capacity):
+        assert client.get("/api/questions").status_code == 404  # empty bank, but admitted
+    response = client.get("/api/questions")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) == pytest.approx(1 / refill_rate, abs=1)
+    # Other route groups have their own buckets
+    assert client.get("/").status_code == 200
+    counters = client.get("/api/stats").json()["admission"]["counters"]
+    assert counters == {"admitted": capacity + 2, "rate_limited": 1}
+
+
+def test_requests_over_the_local_bound_skip_the_store(client, store, monkeypatch):
+    capacity, refill_rate = backend.ROUTE_LIMITS["questions"]
+    for _ in range(capacity):
+        client.get("/api/questions")
+    monkeypatch.setattr(store, "take", lambda *args: pytest.fail("store was asked"))
+    for _ in range(3):
+        assert client.get("/api/questions").status_code == 429
+    assert store.worker_counters["rate_limited"] == 3
+
+
+def test_buckets_are_shared_and_rejections_write_nothing(client, store, monkeypatch, tmp_path):
+    capacity, refill_rate = backend.ROUTE_LIMITS["questions"]
+    for _ in range(capacity):
+        client.get("/api/questions")
+    bucket = store.conn.execute("SELECT tokens, updated FROM buckets").fetchall()
+
+    # A second worker sharing the store has no local state, so it asks the store
+    other_worker = backend.AdmissionStore(store.path)
+    monkeypatch.setattr(backend, "admission", other_worker)
+    assert client.get("/api/questions").status_code == 429
+    assert other_worker.worker_counters["rate_limited"] == 1
+    assert store.conn.execute("SELECT tokens, updated FROM buckets").fetchall() == bucket
+    assert store.conn.execute("SELECT * FROM counters").fetchall() == []
+
+
+def test_store_errors_fall_back_to_per_worker_buckets(client, store, monkeypatch):
+    def broken_take(*args):
+        raise backend.sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(store, "take", broken_take)
+    capacity, refill_rate = backend.ROUTE_LIMITS["questions"]
+    for _ in range(capacity):
+        assert client.get("/api/questions").status_code == 404
+    assert client.get("/api/questions").status_code == 429
+    assert store.worker_counters["store_errors"] == capacity
+
+
+def test_store_errors_in_report_do_not_fail_stats(client, store, monkeypatch):
+    def broken(*args):
+        raise backend.sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(store, "take", broken)
+    monkeypatch.setattr(store, "read_counters", broken)
+    stats = client.get("/api/stats")
+    assert stats.status_code == 200
+    assert stats.json()["admission"]["store_error"] == "database is locked"
+    # Counts that could not be flushed are kept for the next attempt
+    assert store.unflushed == {"store_errors": 1, "admitted": 1}
+
+
+def test_declared_oversized_body_gets_413(client, store):
+    response = client.post(
+        "/api/submit-quiz",
+        content=b"x" * (backend.MAX_BODY_BYTES + 1),
+        headers={"content-type": "application/json"}
+    )
+    assert response.status_code == 413
+    assert store.worker_counters["too_large"] == 1
+
+
+def test_chunked_oversized_body_gets_413(client, store):
+    def chunks():
+        for _ in range(backend.MAX_BODY_BYTES // 1024 + 2):
+            yield b" " * 1024
+
+    response = client.post(
+        "/api/submit-quiz", content=chunks(), headers={"content-type": "application/json"}
+    )
+    assert "content-length" not in response.request.headers
+    assert response.status_code == 413
+    assert store.worker_counters["too_large"] == 1
+
+
+def test_requests_queued_for_admission_are_shed_with_503(client, store, monkeypatch):
+    def slow_take(key, capacity, refill_rate, cost, pending=None):
+        time.sleep(0.2)
+        return 0, capacity - cost, time.time()
+
+    monkeypatch.setattr(backend, "MAX_CONCURRENT_REQUESTS", 4)
+    monkeypatch.setattr(store, "take", slow_take)
+
+    async def flood():
+        transport = httpx.ASGITransport(app=backend.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(http.get(f"/?n={n}") for n in range(12)))
+
+    responses = asyncio.run(flood())
+    assert sorted(r.status_code for r in responses) == [200] * 4 + [503] * 8
+    assert store.worker_counters["shed"] == 8
+    assert store.in_flight == 0
+
+
+def test_unusable_store_falls_back_to_per_worker_limits(client, tmp_path, monkeypatch):
+    store = backend.AdmissionStore(str(tmp_path / "missing" / "admission.db"))
+    monkeypatch.setattr(backend, "admission", store)
+    assert client.get("/").status_code == 200
+    assert store.path == ":memory:"
+    assert client.get("/api/stats").json()["admission"]["counters"] == {"admitted": 2}
+
+
+@pytest.mark.parametrize("num_questions", [0, -1, backend.MAX_QUIZ_QUESTIONS + 1])
+def test_quiz_size_out_of_range_gets_400(client, store, num_questions):
+    backend.install_bank(None, backend.build_bank([make_question(1), make_question(2)]))
+    assert client.get(f"/api/quiz/{num_questions}").status_code == 400
+
+
+def test_too_many_answers_gets_400(client, store):
+    answers = {str(n): 0 for n in range(backend.MAX_ANSWERS + 1)}
+    assert client.post("/api/submit-quiz", json={"answers": answers}).status_code == 400
+
+
+def test_answers_must_be_a_mapping(client, store):
+    assert client.post("/api/submit-quiz", json={"answers": [0, 1]}).status_code == 400
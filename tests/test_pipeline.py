@@ -0,0 +1,105 @@
+import json
+import os
+import stat
+
+import pytest
+
+import pipeline
+from pipeline import atomic_ndjson_writer, run_pipeline
+
+EPISODES = [
+    {
+        "episode_number": f"S1E{n}",
+        "title": f"Episode {n}",
+        "summary": f"Rick and Morty go on adventure number {n} across the multiverse.",
+        "characters": ["Rick Sanchez", "Morty Smith", "Summer Smith"],
+        "quotes": ["Wubba lubba dub dub!", "Aw geez Rick!"]
+    }
+    for n in range(1, 6)
+]
+
+
+def read_ndjson(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_writer_publishes_readable_file(tmp_path):
+    target = tmp_path / "bank.ndjson"
+    with atomic_ndjson_writer(str(target)) as write:
+        write({"id": 1})
+        write({"id": 2})
+    assert read_ndjson(target) == [{"id": 1}, {"id": 2}]
+    assert stat.S_IMODE(os.stat(target).st_mode) == 0o644
+
+
+def test_writer_discards_temp_file_on_error(tmp_path):
+    target = tmp_path / "bank.ndjson"
+    target.write_text('{"id": "old"}\n')
+    with pytest.raises(ValueError):
+        with atomic_ndjson_writer(str(target)) as write:
+            write({"id": "new"})
+            raise ValueError("generation failed")
+    assert read_ndjson(target) == [{"id": "old"}]
+    assert os.listdir(tmp_path) == ["bank.ndjson"]
+
+
+def test_pipeline_publishes_episodes_and_questions(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "iter_rick_and_morty_episodes", lambda: iter(EPISODES))
+    episodes_file, bank_file = tmp_path / "episodes.ndjson", tmp_path / "bank.ndjson"
+    count = run_pipeline(str(episodes_file), str(bank_file))
+    assert read_ndjson(episodes_file) == EPISODES
+    assert len(read_ndjson(bank_file)) == count > 0
+
+
+def test_partial_scrape_publishes_nothing(tmp_path, monkeypatch):
+    def interrupted_scrape():
+        yield EPISODES[0]
+        raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(pipeline, "iter_rick_and_morty_episodes", interrupted_scrape)
+    episodes_file, bank_file = tmp_path / "episodes.ndjson", tmp_path / "bank.ndjson"
+    episodes_file.write_text('{"title": "old"}\n')
+    bank_file.write_text('{"id": "old"}\n')
+    with pytest.raises(ConnectionError):
+        run_pipeline(str(episodes_file), str(bank_file))
+    assert read_ndjson(episodes_file) == [{"title": "old"}]
+    assert read_ndjson(bank_file) == [{"id": "old"}]
+    assert sorted(os.listdir(tmp_path)) == ["bank.ndjson", "episodes.ndjson"]
+
+
+def test_failed_generation_publishes_nothing(tmp_path, monkeypatch):
+    def broken_generator(episodes_data):
+        yield {"id": 1}
+        raise KeyError("title")
+
+    monkeypatch.setattr(pipeline, "iter_rick_and_morty_episodes", lambda: iter(EPISODES))
+    monkeypatch.setattr(pipeline, "iter_all_questions", broken_generator)
+    episodes_file, bank_file = tmp_path / "episodes.ndjson", tmp_path / "bank.ndjson"
+    episodes_file.write_text('{"title": "old"}\n')
+    with pytest.raises(KeyError):
+        run_pipeline(str(episodes_file), str(bank_file))
+    assert read_ndjson(episodes_file) == [{"title": "old"}]
+    assert os.listdir(tmp_path) == ["episodes.ndjson"]
+
+
+def test_failure_finishing_a_file_publishes_nothing(tmp_path, monkeypatch):
+    fchmod = os.fchmod
+    calls = []
+
+    def failing_fchmod(fd, mode):
+        calls.append(fd)
+        if len(calls) == 2:
+            raise OSError("disk full")
+        fchmod(fd, mode)
+
+    monkeypatch.setattr(pipeline, "iter_rick_and_morty_episodes", lambda: iter(EPISODES))
+    monkeypatch.setattr(pipeline.os, "fchmod", failing_fchmod)
+    episodes_file, bank_file = tmp_path / "episodes.ndjson", tmp_path / "bank.ndjson"
+    episodes_file.write_text('{"title": "old"}\n')
+    bank_file.write_text('{"id": "old"}\n')
+    with pytest.raises(OSError):
+        run_pipeline(str(episodes_file), str(bank_file))
+    assert read_ndjson(episodes_file) == [{"title": "old"}]
+    assert read_ndjson(bank_file) == [{"id": "old"}]
+    assert sorted(os.listdir(tmp_path)) == ["bank.ndjson", "episodes.ndjson"]
@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+
+from question_generator import (
+    iter_all_questions,
+    iter_character_questions,
+    iter_episode_questions,
+    iter_quote_questions,
+    load_scraped_data,
+)
+
+SCRAPED_DATA = os.path.join(os.path.dirname(__file__), '..', 'scraped_data.json')
+
+EPISODES = [
+    {
+        "title": "Pilot",
+        "summary": "Rick takes Morty on their first adventure to another dimension.",
+        "characters": ["Rick Sanchez", "Morty Smith", "Jessica"],
+        "quotes": ["Wubba lubba dub dub!"]
+    },
+    {
+        "title": "Pickle Rick",
+        "summary": "Rick turns himself into a pickle to avoid family therapy.",
+        "characters": ["Rick Sanchez", "Beth Smith"],
+        "quotes": ["I'm Pickle Rick!"]
+    }
+]
+
+# Fails every filter: short summary, a single character and no quotes
+SHORT_EPISODE = {"title": "Short", "summary": "Too short", "characters": ["Unity"], "quotes": []}
+
+
+@pytest.mark.parametrize("generator", [
+    iter_episode_questions,
+    iter_character_questions,
+    iter_quote_questions,
+])
+def test_episode_failing_filters_yields_nothing_for_it(generator):
+    assert [q for q in generator([SHORT_EPISODE]) if "Short" in q["question"]] == []
+
+
+@pytest.mark.parametrize("generator", [
+    iter_episode_questions,
+    iter_character_questions,
+    iter_quote_questions,
+])
+def test_episode_failing_filters_does_not_repeat_questions(generator):
+    questions = list(generator(EPISODES + [SHORT_EPISODE]))
+    assert len({q["id"] for q in questions}) == len(questions)
+    assert questions == [q for q in questions if "Short" not in q["question"]]
+
+
+def test_character_relationships_skip_missing_main_characters():
+    questions = list(iter_character_questions(EPISODES))
+    relationships = [q for q in questions if q["type"] == "character_relationship"]
+    assert [q["correct_answer"] for q in relationships] == ["Grandfather", "Grandson", "Mother"]
+
+
+def test_all_questions_have_unique_ids_and_valid_answers():
+    with open(SCRAPED_DATA) as f:
+        episodes_data = json.load(f)
+    questions = list(iter_all_questions(episodes_data + [SHORT_EPISODE]))
+    assert len({q["id"] for q in questions}) == len(questions)
+    for q in questions:
+        assert q["options"][q["correct_index"]] == q["correct_answer"]
+
+
+def test_load_scraped_data_reads_the_newest_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ndjson, legacy = tmp_path / "scraped_data.ndjson", tmp_path / "scraped_data.json"
+    ndjson.write_text("\n".join(json.dumps(episode) for episode in EPISODES) + "\n")
+    legacy.write_text(json.dumps([SHORT_EPISODE]))
+    os.utime(legacy, ns=(0, 1_000_000_000))
+    os.utime(ndjson, ns=(0, 2_000_000_000))
+    assert load_scraped_data() == EPISODES
+
+    os.utime(legacy, ns=(0, 3_000_000_000))
+    assert load_scraped_data() == [SHORT_EPISODE]
+
+
+def test_load_scraped_data_without_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert load_scraped_data() == []